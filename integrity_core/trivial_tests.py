@@ -119,19 +119,34 @@ class TrivialTestChecker:
     
     def analyze_test_file(self, file_path: Path) -> List[Tuple[str, str]]:
         """Analyze a test file for trivial tests.
+        
+        Args:
+            file_path: Path to test file
+            
+        Returns:
+            List of (test_name, reason) tuples for trivial tests
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except UnicodeDecodeError as e:
+            return [("parse_error", f"Could not parse file: {e}")]
+        return self.analyze_source(content, file_path)
+    
+    def analyze_source(self, content: str, file_path: Path = Path("<test>")) -> List[Tuple[str, str]]:
+        """Analyze test source code for trivial tests.
         - Do not flag tests using pytest.raises
         - Do not flag tests with asserts in helper functions (detect via AST)
         - Support #ALLOW_TRIVIAL marker above the function
         Args:
-            file_path: Path to test file
+            content: Source code of the test module
+            file_path: Path reported in syntax errors
         Returns:
             List of (test_name, reason) tuples for trivial tests
         """
         trivial_tests = []
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            tree = ast.parse(content)
+            tree = ast.parse(content, filename=str(file_path))
             lines = content.splitlines()
             for node in ast.walk(tree):
                 if isinstance(node, ast.FunctionDef) and node.name.startswith('test_'):
@@ -175,7 +190,7 @@ class TrivialTestChecker:
                         continue
                     if not self.has_meaningful_assertions(node):
                         trivial_tests.append((node.name, "No meaningful assertions"))
-        except (SyntaxError, UnicodeDecodeError) as e:
+        except SyntaxError as e:
             trivial_tests.append(("parse_error", f"Could not parse file: {e}"))
         return trivial_tests
     
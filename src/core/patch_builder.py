@@ -3,6 +3,11 @@
 import re
 from dataclasses import dataclass
 
+# Unified diff header patterns used by PatchBuilder.validate_patch
+_FILE_HEADER_MINUS_RE = re.compile(r'^--- ', re.MULTILINE)
+_FILE_HEADER_PLUS_RE = re.compile(r'^\+\+\+ ', re.MULTILINE)
+_HUNK_HEADER_RE = re.compile(r'^@@ ', re.MULTILINE)
+
 
 @dataclass
 class CodeBlock:
@@ -351,14 +356,12 @@ class PatchBuilder:
             )
 
         # Basic validation - check for required diff headers
-        lines = patch_content.split('\n')
-
         # Check for file headers
-        has_file_header = any(line.startswith('--- ') for line in lines)
-        has_file_header_plus = any(line.startswith('+++ ') for line in lines)
+        has_file_header = _FILE_HEADER_MINUS_RE.search(patch_content) is not None
+        has_file_header_plus = _FILE_HEADER_PLUS_RE.search(patch_content) is not None
 
         # Check for hunk headers
-        has_hunk_header = any(line.startswith('@@ ') for line in lines)
+        has_hunk_header = _HUNK_HEADER_RE.search(patch_content) is not None
 
         # If we have no file headers and no hunk headers, it's completely invalid
         if not has_file_header and not has_file_header_plus and not has_hunk_header:
@@ -10,6 +10,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+# Module-level alias so tests can swap the OPA subprocess call with a plain setattr
+_subprocess_run = subprocess.run
+
 
 @dataclass
 class PolicyResult:
@@ -100,7 +103,7 @@ class PolicyEngine:
             True if OPA is available
         """
         try:
-            result = subprocess.run(
+            result = _subprocess_run(
                 ["opa", "version"],
                 capture_output=True,
                 text=True,
@@ -131,7 +134,7 @@ class PolicyEngine:
                 "data.promptops.policy.summary"
             ]
             
-            result = subprocess.run(
+            result = _subprocess_run(
                 cmd,
                 input=input_json,
                 capture_output=True,
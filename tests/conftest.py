@@ -0,0 +1,11 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def expander():
+    """One SpecExpander per session (per xdist worker); expand_task does not mutate it."""
+    # Deferred so loading conftest does not import the whole src.core package
+    from src.core.spec_expander import SpecExpander
+    return SpecExpander()
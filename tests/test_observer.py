@@ -1,174 +1,151 @@
 """Tests for observer module."""
 
 import pytest
+from types import MappingProxyType
 from unittest.mock import patch, MagicMock
 
 from src.observer.observer import Observer
 from src.observer.models import IntegrityReport, IntegrityViolation, ViolationType
 
 
-class TestObserver:
-    """Test observer functionality."""
-
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.observer = Observer()
-
-    def test_build_integrity_report_good_run(self):
-        """Test integrity report for a good run."""
-        run_data = {
-            'coverage': 85,
-            'baseline_coverage': 80,
-            'diff_coverage': 100,
-            'skipped_tests': 0,
-            'deleted_test_files': [],
-            'threshold_changed': False,
-            'code_lines': 1000,
-            'test_lines': 200,
-            'content': 'Clean code with no weasel words',
-            'claimed_success': True,
-            'pytest_success': True
-        }
-        
-        report = self.observer.build_integrity_report("test-run-1", run_data)
-        
-        assert report.run_id == "test-run-1"
-        assert report.score == 100.0
-        assert len(report.violations) == 0
-        assert len(report.questions) == 0
-        assert "Excellent integrity" in report.summary
-
-    def test_build_integrity_report_coverage_drop(self):
-        """Test integrity report for coverage drop."""
-        run_data = {
-            'coverage': 70,  # Dropped from 80
-            'baseline_coverage': 80,
-            'diff_coverage': 100,
-            'skipped_tests': 0,
-            'deleted_test_files': [],
-            'threshold_changed': False,
-            'code_lines': 1000,
-            'test_lines': 200,
-            'content': 'Clean code',
-            'claimed_success': True,
-            'pytest_success': True
-        }
-        
-        report = self.observer.build_integrity_report("test-run-2", run_data)
-        
-        assert report.score < 100.0
-        assert len(report.violations) == 1
-        assert report.violations[0].type == ViolationType.COVERAGE_DROP
-        assert len(report.questions) == 1
-        assert "coverage drop" in report.questions[0].lower()
-
-    def test_build_integrity_report_weasel_words(self):
-        """Test integrity report for weasel words."""
-        run_data = {
-            'coverage': 85,
-            'baseline_coverage': 80,
-            'diff_coverage': 100,
-            'skipped_tests': 0,
-            'deleted_test_files': [],
-            'threshold_changed': False,
-            'code_lines': 1000,
-            'test_lines': 200,
-            'content': 'This is a temporary fix just to pass the tests',
-            'claimed_success': True,
-            'pytest_success': True
-        }
-        
-        report = self.observer.build_integrity_report("test-run-3", run_data)
-        
-        assert report.score < 100.0
-        assert len(report.violations) == 1
-        assert report.violations[0].type == ViolationType.WEASEL_WORDS
-        assert "weasel words" in report.violations[0].message
-        assert len(report.questions) == 1
-
-    def test_build_integrity_report_claim_mismatch(self):
-        """Test integrity report for claim mismatch."""
-        run_data = {
-            'coverage': 85,
-            'baseline_coverage': 80,
-            'diff_coverage': 100,
-            'skipped_tests': 0,
-            'deleted_test_files': [],
-            'threshold_changed': False,
-            'code_lines': 1000,
-            'test_lines': 200,
-            'content': 'Clean code',
-            'claimed_success': True,
-            'pytest_success': False  # Mismatch
-        }
-        
-        report = self.observer.build_integrity_report("test-run-4", run_data)
-        
-        assert report.score < 100.0
-        assert len(report.violations) == 1
-        assert report.violations[0].type == ViolationType.CLAIM_MISMATCH
-        assert len(report.questions) == 1
-
-    def test_build_integrity_report_multiple_violations(self):
-        """Test integrity report for multiple violations."""
-        run_data = {
+# (run data overrides, expected violation types in check order, expected score)
+BUILD_REPORT_CASES = [
+    ({'content': 'Clean code with no weasel words'}, [], 100.0),
+    ({'coverage': 70}, [ViolationType.COVERAGE_DROP], 60.0),
+    ({'content': 'This is a temporary fix just to pass the tests'}, [ViolationType.WEASEL_WORDS], 98.5),
+    ({'pytest_success': False}, [ViolationType.CLAIM_MISMATCH], 60.0),
+    (
+        {
             'coverage': 70,
-            'baseline_coverage': 80,
             'diff_coverage': 85,
             'skipped_tests': 5,
             'deleted_test_files': ['test_file.py'],
             'threshold_changed': True,
-            'code_lines': 1000,
             'test_lines': 50,  # Low ratio
             'content': 'Temporary fix TODO later',
-            'claimed_success': True,
             'pytest_success': False
-        }
-        
-        report = self.observer.build_integrity_report("test-run-5", run_data)
-        
-        assert report.score < 50.0  # Should be very low
-        assert len(report.violations) >= 5
-        assert len(report.questions) >= 5
-
-    def test_calculate_score_no_violations(self):
-        """Test score calculation with no violations."""
-        violations = []
-        score = self.observer._calculate_score(violations)
-        assert score == 100.0
-
-    def test_calculate_score_with_violations(self):
-        """Test score calculation with violations."""
-        violations = [
-            IntegrityViolation(
-                type=ViolationType.COVERAGE_DROP,
-                message="Coverage dropped",
-                severity="critical",
-                weight=2.0
-            )
-        ]
-        score = self.observer._calculate_score(violations)
-        assert score < 100.0
-
-    def test_get_severity_multiplier(self):
-        """Test severity multiplier calculation."""
-        assert self.observer._get_severity_multiplier("warning") == 5
-        assert self.observer._get_severity_multiplier("error") == 10
-        assert self.observer._get_severity_multiplier("critical") == 20
-        assert self.observer._get_severity_multiplier("unknown") == 10
-
-    def test_generate_summary(self):
-        """Test summary generation."""
-        violations = []
-        
-        summary = self.observer._generate_summary(95, violations)
-        assert "Excellent" in summary
-        
-        summary = self.observer._generate_summary(85, violations)
-        assert "Good" in summary
-        
-        summary = self.observer._generate_summary(75, violations)
-        assert "Acceptable" in summary
-        
-        summary = self.observer._generate_summary(65, violations)
-        assert "Poor" in summary 
\ No newline at end of file
+        },
+        [
+            ViolationType.COVERAGE_DROP,
+            ViolationType.DIFF_COVERAGE_FAIL,
+            ViolationType.TEST_SKIPS,
+            ViolationType.TEST_DELETIONS,
+            ViolationType.THRESHOLD_EDITS,
+            ViolationType.CODE_TEST_RATIO,
+            ViolationType.WEASEL_WORDS,
+            ViolationType.CLAIM_MISMATCH,
+        ],
+        0.0,
+    ),
+]
+
+# (run data overrides, report text getter, fragment the text must contain)
+REPORT_TEXT_CASES = [
+    pytest.param(
+        {'content': 'Clean code with no weasel words'},
+        lambda report: report.summary,
+        'Excellent integrity',
+        id="good_run_summary",
+    ),
+    pytest.param(
+        {'coverage': 70},
+        lambda report: report.questions[0].lower(),
+        'coverage drop',
+        id="coverage_drop_question",
+    ),
+    pytest.param(
+        {'content': 'This is a temporary fix just to pass the tests'},
+        lambda report: report.violations[0].message,
+        'weasel words',
+        id="weasel_words_message",
+    ),
+]
+
+
+@pytest.fixture(scope="session")
+def base_run_data():
+    """Read-only run data for a clean run; tests derive variants with {**base, ...}."""
+    return MappingProxyType({
+        'coverage': 85,
+        'baseline_coverage': 80,
+        'diff_coverage': 100,
+        'skipped_tests': 0,
+        'deleted_test_files': [],
+        'threshold_changed': False,
+        'code_lines': 1000,
+        'test_lines': 200,
+        'content': 'Clean code',
+        'claimed_success': True,
+        'pytest_success': True
+    })
+
+
+@pytest.fixture(scope="module")
+def observer():
+    """Observer shared by the tests in this module."""
+    return Observer()
+
+
+@pytest.mark.parametrize("delta,expected_types,expected_score", BUILD_REPORT_CASES, ids=[
+    "good_run", "coverage_drop", "weasel_words", "claim_mismatch", "multiple_violations"
+])
+def test_build_integrity_report(observer, base_run_data, delta, expected_types, expected_score):
+    """Test integrity reports for runs derived from a clean baseline."""
+    report = observer.build_integrity_report("test-run", {**base_run_data, **delta})
+
+    assert report.run_id == "test-run"
+    assert [v.type for v in report.violations] == expected_types
+    assert len(report.questions) == len(expected_types)
+    assert report.score == expected_score
+
+
+@pytest.mark.parametrize("delta,report_text,fragment", REPORT_TEXT_CASES)
+def test_build_integrity_report_text(observer, base_run_data, delta, report_text, fragment):
+    """Test the summary, question and violation text of derived runs."""
+    report = observer.build_integrity_report("test-run", {**base_run_data, **delta})
+
+    assert fragment in report_text(report)
+
+
+def test_calculate_score_no_violations(observer):
+    """Test score calculation with no violations."""
+    violations = []
+    score = observer._calculate_score(violations)
+    assert score == 100.0
+
+
+def test_calculate_score_with_violations(observer):
+    """Test score calculation with violations."""
+    violations = [
+        IntegrityViolation(
+            type=ViolationType.COVERAGE_DROP,
+            message="Coverage dropped",
+            severity="critical",
+            weight=2.0
+        )
+    ]
+    score = observer._calculate_score(violations)
+    assert score < 100.0
+
+
+@pytest.mark.parametrize("severity,expected", [
+    ("warning", 5),
+    ("error", 10),
+    ("critical", 20),
+    ("unknown", 10),
+])
+def test_get_severity_multiplier(observer, severity, expected):
+    """Test severity multiplier calculation."""
+    assert observer._get_severity_multiplier(severity) == expected
+
+
+@pytest.mark.parametrize("score,expected", [
+    (95, "Excellent"),
+    (85, "Good"),
+    (75, "Acceptable"),
+    (65, "Poor"),
+])
+def test_generate_summary(observer, score, expected):
+    """Test summary generation."""
+    summary = observer._generate_summary(score, [])
+    assert expected in summary
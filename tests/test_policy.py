@@ -2,250 +2,250 @@
 
 import json
 import pytest
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch
 from src.core.policy import PolicyEngine, PolicyResult
 
 
-class TestPolicyEngine:
-    """Test policy engine functionality."""
-
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.engine = PolicyEngine("policy/rules.rego")
-
-    def test_evaluate_policy_allowed(self):
-        """Test policy evaluation that should be allowed."""
-        input_data = {
-            "diff_loc": 100,
-            "acceptance_criteria": ["Test passes", "Code is clean"],
-            "new_dependencies": [],
-            "dependency_justification": [],
-            "security_findings": [],
-            "performance_findings": [],
-            "test_files": ["test_file.py"],
-            "large_files": [],
-            "secret_findings": []
+_OPA_SUCCESS_STDOUT = json.dumps({
+    "result": [{
+        "summary": {
+            "allowed": True,
+            "violations": [],
+            "violation_count": 0
         }
-
-        with patch.object(self.engine, '_check_opa_available', return_value=True):
-            with patch('pathlib.Path.exists', return_value=True):
-                with patch.object(self.engine, '_run_opa_eval') as mock_opa:
-                    mock_opa.return_value = {
-                        "summary": {
-                            "allowed": True,
-                            "violations": [],
-                            "violation_count": 0
-                        }
-                    }
-                    result = self.engine.evaluate_policy(input_data)
-
-                    assert result.allowed is True
-                    assert result.violations == []
-                    assert result.violation_count == 0
-                    assert result.error is None
-
-    def test_evaluate_policy_denied(self):
-        """Test policy evaluation that should be denied."""
-        input_data = {
-            "diff_loc": 400,  # Too large
-            "acceptance_criteria": [],
-            "new_dependencies": [],
-            "dependency_justification": [],
-            "security_findings": [],
-            "performance_findings": [],
-            "test_files": [],
-            "large_files": [],
-            "secret_findings": []
+    }]
+})
+
+
+@pytest.fixture(scope="session")
+def policy_engine():
+    """Shared policy engine; tests patch its methods rather than rebuilding it."""
+    return PolicyEngine("policy/rules.rego")
+
+
+@pytest.fixture
+def opa_env(monkeypatch):
+    """Return a helper that stubs OPA availability, the policy file and OPA output."""
+    def _apply(opa_available=True, policy_exists=True, opa_result=None):
+        monkeypatch.setattr(PolicyEngine, "_check_opa_available", lambda self: opa_available)
+        monkeypatch.setattr("pathlib.Path.exists", lambda self: policy_exists)
+        if opa_result is not None:
+            monkeypatch.setattr(PolicyEngine, "_run_opa_eval", lambda self, input_data: opa_result)
+
+    return _apply
+
+
+@pytest.fixture
+def fake_subprocess_run(monkeypatch):
+    """Return a helper that replaces the policy module's subprocess runner."""
+    def _apply(returncode=0, stdout="", stderr="", exc=None):
+        def _run(*args, **kwargs):
+            if exc is not None:
+                raise exc
+            return SimpleNamespace(returncode=returncode, stdout=stdout, stderr=stderr)
+
+        monkeypatch.setattr("src.core.policy._subprocess_run", _run)
+
+    return _apply
+
+
+def test_evaluate_policy_allowed(policy_engine, opa_env):
+    """Test policy evaluation that should be allowed."""
+    input_data = {
+        "diff_loc": 100,
+        "acceptance_criteria": ["Test passes", "Code is clean"],
+        "new_dependencies": [],
+        "dependency_justification": [],
+        "security_findings": [],
+        "performance_findings": [],
+        "test_files": ["test_file.py"],
+        "large_files": [],
+        "secret_findings": []
+    }
+
+    opa_env(opa_result={
+        "summary": {
+            "allowed": True,
+            "violations": [],
+            "violation_count": 0
         }
-
-        with patch.object(self.engine, '_check_opa_available', return_value=True):
-            with patch('pathlib.Path.exists', return_value=True):
-                with patch.object(self.engine, '_run_opa_eval') as mock_opa:
-                    mock_opa.return_value = {
-                        "summary": {
-                            "allowed": False,
-                            "violations": [{"id": "DIFF_TOO_LARGE", "severity": "error"}],
-                            "violation_count": 1
-                        }
-                    }
-
-                    result = self.engine.evaluate_policy(input_data)
-
-                    assert result.allowed is False
-                    assert any(v["id"] == "DIFF_TOO_LARGE" for v in result.violations)
-                    assert result.violation_count == 1
-                    assert result.error is None
-
-    def test_evaluate_policy_opa_not_available(self):
-        """Test policy evaluation when OPA is not available."""
-        with patch.object(self.engine, '_check_opa_available', return_value=False):
-            result = self.engine.evaluate_policy({})
-
-            assert result.allowed is False
-            assert "opa_not_available" in result.violations
-            assert result.error is not None
-            assert "OPA" in result.error
-
-    def test_evaluate_policy_file_not_found(self):
-        """Test policy evaluation when policy file is not found."""
-        with patch.object(self.engine, '_check_opa_available', return_value=True):
-            with patch('pathlib.Path.exists', return_value=False):
-                result = self.engine.evaluate_policy({})
-
-                assert result.allowed is False
-                assert "policy_file_not_found" in result.violations
-                assert result.error is not None
-                assert "Policy file not found" in result.error
-
-    def test_evaluate_policy_opa_error(self):
-        """Test policy evaluation when OPA returns an error."""
-        with patch.object(self.engine, '_check_opa_available', return_value=True):
-            with patch('pathlib.Path.exists', return_value=True):
-                with patch.object(self.engine, '_run_opa_eval') as mock_opa:
-                    mock_opa.return_value = {"error": "OPA evaluation failed"}
-
-                    result = self.engine.evaluate_policy({})
-
-                    assert result.allowed is False
-                    assert "opa_evaluation_error" in result.violations
-                    assert result.error is not None
-
-    def test_evaluate_run_success(self):
-        """Test evaluating policy for a specific run."""
-        mock_db = MagicMock()
-        mock_run = MagicMock()
-        mock_run.task_id = 1
-        mock_run.logs = "+ def test_function():\n+     pass"
-        mock_task = MagicMock()
-        mock_task.built_prompt = "- Test passes\n- Code is clean"
-
-        mock_db.get_run.return_value = mock_run
-        mock_db.get_task.return_value = mock_task
-
-        with patch.object(self.engine, 'evaluate_policy') as mock_eval:
-            mock_eval.return_value = PolicyResult(
-                allowed=True,
-                violations=[],
-                violation_count=0,
-                details={}
-            )
-
-            result = self.engine.evaluate_run(1, mock_db)
-
-            assert result.allowed is True
-            assert result.violations == []
-            assert result.violation_count == 0
-
-    def test_evaluate_run_not_found(self):
-        """Test evaluating policy for a non-existent run."""
-        mock_db = MagicMock()
-        mock_db.get_run.return_value = None
-
-        result = self.engine.evaluate_run(999, mock_db)
-
-        assert result.allowed is False
-        assert "run_not_found" in result.violations
-        assert result.error is not None
-
-    def test_evaluate_run_task_not_found(self):
-        """Test evaluating policy when task is not found."""
-        mock_db = MagicMock()
-        mock_run = MagicMock()
-        mock_run.task_id = 1
-        mock_db.get_run.return_value = mock_run
-        mock_db.get_task.return_value = None
-
-        result = self.engine.evaluate_run(1, mock_db)
-
-        assert result.allowed is False
-        assert "task_not_found" in result.violations
-        assert result.error is not None
-
-    def test_estimate_diff_size(self):
-        """Test diff size estimation."""
-        logs = "+ def new_function():\n+     return True\n- def old_function():\n-     return False"
-        size = self.engine._estimate_diff_size(logs)
-        assert size == 2  # Only + lines count
-
-    def test_extract_acceptance_criteria(self):
-        """Test acceptance criteria extraction."""
-        prompt = """
-        Task: Add retry logic
-        
-        - Test passes
-        - Code is clean
-        - No hardcoded secrets
-        """
-        ac = self.engine._extract_acceptance_criteria(prompt)
-        assert len(ac) == 3
-        assert "- Test passes" in ac[0]
-        assert "- Code is clean" in ac[1]
-        assert "- No hardcoded secrets" in ac[2]
-
-    def test_extract_test_files(self):
-        """Test test file extraction."""
-        logs = """
-        Running tests...
-        test_file.py: PASS
-        src/main.py: modified
-        tests/test_other.py: PASS
-        """
-        test_files = self.engine._extract_test_files(logs)
-        assert len(test_files) == 1  # Only tests/test_other.py matches the logic
-        assert "tests/test_other.py: PASS" in test_files[0]
-
-    def test_check_opa_available(self):
-        """Test OPA availability check."""
-        with patch('subprocess.run') as mock_run:
-            mock_run.return_value.returncode = 0
-            assert self.engine._check_opa_available() is True
-
-            mock_run.return_value.returncode = 1
-            assert self.engine._check_opa_available() is False
-
-            mock_run.side_effect = FileNotFoundError()
-            assert self.engine._check_opa_available() is False
-
-    def test_run_opa_eval_success(self):
-        """Test successful OPA evaluation."""
-        input_data = {"test": "data"}
-        expected_output = {
-            "result": [{
-                "summary": {
-                    "allowed": True,
-                    "violations": [],
-                    "violation_count": 0
-                }
-            }]
+    })
+    result = policy_engine.evaluate_policy(input_data)
+
+    assert result.allowed is True
+    assert result.violations == []
+    assert result.violation_count == 0
+    assert result.error is None
+
+
+def test_evaluate_policy_denied(policy_engine, opa_env):
+    """Test policy evaluation that should be denied."""
+    input_data = {
+        "diff_loc": 400,  # Too large
+        "acceptance_criteria": [],
+        "new_dependencies": [],
+        "dependency_justification": [],
+        "security_findings": [],
+        "performance_findings": [],
+        "test_files": [],
+        "large_files": [],
+        "secret_findings": []
+    }
+
+    opa_env(opa_result={
+        "summary": {
+            "allowed": False,
+            "violations": [{"id": "DIFF_TOO_LARGE", "severity": "error"}],
+            "violation_count": 1
         }
+    })
+    result = policy_engine.evaluate_policy(input_data)
+    violation_ids = {v.get("id") for v in result.violations if isinstance(v, dict)}
+
+    assert result.allowed is False
+    assert "DIFF_TOO_LARGE" in violation_ids
+    assert result.violation_count == 1
+    assert result.error is None
+
+
+@pytest.mark.parametrize("opa_available,policy_exists,opa_result,expected_violation,expected_error", [
+    (False, True, None, "opa_not_available", "OPA"),
+    (True, False, None, "policy_file_not_found", "Policy file not found"),
+    (True, True, {"error": "OPA evaluation failed"}, "opa_evaluation_error", "OPA"),
+], ids=["opa_not_available", "file_not_found", "opa_error"])
+def test_evaluate_policy_error_paths(policy_engine, opa_env, opa_available, policy_exists,
+                                     opa_result, expected_violation, expected_error):
+    """Test policy evaluation when OPA or the policy file cannot be used."""
+    opa_env(opa_available=opa_available, policy_exists=policy_exists, opa_result=opa_result)
+    result = policy_engine.evaluate_policy({})
+
+    assert result.allowed is False
+    assert expected_violation in result.violations
+    assert result.error is not None
+    assert expected_error in result.error
+
+
+def test_evaluate_run_success(policy_engine):
+    """Test evaluating policy for a specific run."""
+    mock_run = SimpleNamespace(task_id=1, logs="+ def test_function():\n+     pass")
+    mock_task = SimpleNamespace(built_prompt="- Test passes\n- Code is clean")
+    mock_db = SimpleNamespace(
+        get_run=lambda run_id: mock_run,
+        get_task=lambda task_id: mock_task
+    )
+
+    with patch.object(policy_engine, 'evaluate_policy') as mock_eval:
+        mock_eval.return_value = PolicyResult(
+            allowed=True,
+            violations=[],
+            violation_count=0,
+            details={}
+        )
+
+        result = policy_engine.evaluate_run(1, mock_db)
+
+        assert result.allowed is True
+        assert result.violations == []
+        assert result.violation_count == 0
+
+
+def test_evaluate_run_not_found(policy_engine):
+    """Test evaluating policy for a non-existent run."""
+    mock_db = SimpleNamespace(get_run=lambda run_id: None)
+
+    result = policy_engine.evaluate_run(999, mock_db)
+
+    assert result.allowed is False
+    assert "run_not_found" in result.violations
+    assert result.error is not None
+
+
+def test_evaluate_run_task_not_found(policy_engine):
+    """Test evaluating policy when task is not found."""
+    mock_run = SimpleNamespace(task_id=1)
+    mock_db = SimpleNamespace(
+        get_run=lambda run_id: mock_run,
+        get_task=lambda task_id: None
+    )
+
+    result = policy_engine.evaluate_run(1, mock_db)
+
+    assert result.allowed is False
+    assert "task_not_found" in result.violations
+    assert result.error is not None
+
+
+def test_estimate_diff_size(policy_engine):
+    """Test diff size estimation."""
+    logs = "+ def new_function():\n+     return True\n- def old_function():\n-     return False"
+    size = policy_engine._estimate_diff_size(logs)
+    assert size == 2  # Only + lines count
+
+
+def test_extract_acceptance_criteria(policy_engine):
+    """Test acceptance criteria extraction."""
+    prompt = """
+    Task: Add retry logic
+    
+    - Test passes
+    - Code is clean
+    - No hardcoded secrets
+    """
+    ac = policy_engine._extract_acceptance_criteria(prompt)
+    assert len(ac) == 3
+    assert "- Test passes" in ac[0]
+    assert "- Code is clean" in ac[1]
+    assert "- No hardcoded secrets" in ac[2]
+
+
+def test_extract_test_files(policy_engine):
+    """Test test file extraction."""
+    logs = """
+    Running tests...
+    test_file.py: PASS
+    src/main.py: modified
+    tests/test_other.py: PASS
+    """
+    test_files = policy_engine._extract_test_files(logs)
+    assert len(test_files) == 1  # Only tests/test_other.py matches the logic
+    assert "tests/test_other.py: PASS" in test_files[0]
+
+
+def test_check_opa_available(policy_engine, fake_subprocess_run):
+    """Test OPA availability check."""
+    fake_subprocess_run(returncode=0)
+    assert policy_engine._check_opa_available() is True
+
+    fake_subprocess_run(returncode=1)
+    assert policy_engine._check_opa_available() is False
+
+    fake_subprocess_run(exc=FileNotFoundError())
+    assert policy_engine._check_opa_available() is False
 
-        with patch('subprocess.run') as mock_run:
-            mock_run.return_value.returncode = 0
-            mock_run.return_value.stdout = json.dumps(expected_output)
 
-            result = self.engine._run_opa_eval(input_data)
+def test_run_opa_eval_success(policy_engine, fake_subprocess_run):
+    """Test successful OPA evaluation."""
+    fake_subprocess_run(returncode=0, stdout=_OPA_SUCCESS_STDOUT)
+    result = policy_engine._run_opa_eval({"test": "data"})
 
-            assert "summary" in result
-            assert result["summary"]["allowed"] is True
+    assert "summary" in result
+    assert result["summary"]["allowed"] is True
 
-    def test_run_opa_eval_failure(self):
-        """Test OPA evaluation failure."""
-        with patch('subprocess.run') as mock_run:
-            mock_run.return_value.returncode = 1
-            mock_run.return_value.stderr = "OPA error"
 
-            result = self.engine._run_opa_eval({})
+def test_run_opa_eval_failure(policy_engine, fake_subprocess_run):
+    """Test OPA evaluation failure."""
+    fake_subprocess_run(returncode=1, stderr="OPA error")
+    result = policy_engine._run_opa_eval({})
 
-            assert "error" in result
-            assert "OPA evaluation failed" in result.get("error", "")
+    assert "error" in result
+    assert "OPA evaluation failed" in result.get("error", "")
 
-    def test_run_opa_eval_invalid_json(self):
-        """Test OPA evaluation with invalid JSON output."""
-        with patch('subprocess.run') as mock_run:
-            mock_run.return_value.returncode = 0
-            mock_run.return_value.stdout = "invalid json"
 
-            result = self.engine._run_opa_eval({})
+def test_run_opa_eval_invalid_json(policy_engine, fake_subprocess_run):
+    """Test OPA evaluation with invalid JSON output."""
+    fake_subprocess_run(returncode=0, stdout="invalid json")
+    result = policy_engine._run_opa_eval({})
 
-            assert "error" in result
-            assert "Invalid JSON" in result.get("error", "") 
\ No newline at end of file
+    assert "error" in result
+    assert "Invalid JSON" in result.get("error", "")
@@ -1,61 +1,43 @@
 """Tests for prompt builder."""
 
-import json
-import tempfile
-from pathlib import Path
+import importlib
 
 import pytest
 
 from src.core.prompt_builder import PromptBuilder
 
+# src.core re-exports the prompt_builder instance under the module's name
+prompt_builder_module = importlib.import_module("src.core.prompt_builder")
 
-class TestPromptBuilder:
-    """Test cases for PromptBuilder."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        # Create temporary directories
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_dir = Path(self.temp_dir) / "config"
-        self.templates_dir = Path(self.temp_dir) / "templates"
+class MockConfigLoader:
+    """Config loader stub returning fixed prompt context."""
 
-        # Create directories
-        self.config_dir.mkdir()
-        self.templates_dir.mkdir()
-
-        # Create test files
-        self.create_test_files()
+    def get_all_config(self):
+        return {
+            "rules_excerpt": "Test rules excerpt",
+            "context_excerpt": "Test context excerpt",
+            "phase": {
+                "current_phase": "P0",
+                "phase_name": "Test Phase",
+                "description": "Test phase description"
+            }
+        }
 
-        # Initialize prompt builder with test directories
-        self.builder = PromptBuilder(str(self.templates_dir))
 
-    def create_test_files(self):
-        """Create test configuration and template files."""
-        # Create config files
-        rules_content = """# Test Rules
+_RULES = """# Test Rules
 This is a test rules file.
 It contains some basic rules for testing.
 """
-        with open(self.config_dir / "rules.md", "w") as f:
-            f.write(rules_content)
 
-        context_content = """# Test Context
+_CONTEXT = """# Test Context
 This is a test context file.
 It contains project context information.
 """
-        with open(self.config_dir / "context.md", "w") as f:
-            f.write(context_content)
 
-        phase_data = {
-            "current_phase": "P0",
-            "phase_name": "Test Phase",
-            "description": "Test phase description"
-        }
-        with open(self.config_dir / "phase.json", "w") as f:
-            json.dump(phase_data, f)
+_PHASE_JSON = '{"current_phase": "P0", "phase_name": "Test Phase", "description": "Test phase description"}'
 
-        # Create template file
-        template_content = """# Task: {{ task_description }}
+_TASK_PROMPT_TEMPLATE = """# Task: {{ task_description }}
 
 ## Context
 **Phase**: {{ phase.current_phase }} - {{ phase.phase_name }}
@@ -79,50 +61,68 @@ Before submitting your response, verify that you have:
 1. **Followed all rules** from the rules.md file
 2. **Included appropriate tests** for any code changes
 """
-        with open(self.templates_dir / "task_prompt.jinja", "w") as f:
-            f.write(template_content)
 
-    def test_build_task_prompt(self):
-        """Test building a task prompt."""
-        # Create a mock config loader
-        class MockConfigLoader:
-            def get_all_config(self):
-                return {
-                    "rules_excerpt": "Test rules excerpt",
-                    "context_excerpt": "Test context excerpt",
-                    "phase": {
-                        "current_phase": "P0",
-                        "phase_name": "Test Phase",
-                        "description": "Test phase description"
-                    }
-                }
-
-        # Create a new prompt builder with mocked config
-        from unittest.mock import patch
-        with patch('src.core.prompt_builder.config_loader', MockConfigLoader()):
-            # Build prompt
-            task_description = "Implement a test feature"
-            prompt = self.builder.build_task_prompt(task_description)
-
-            # Verify prompt contains expected sections
-            assert "Task: Implement a test feature" in prompt
-            assert "**Phase**: P0 - Test Phase" in prompt
-            assert "Test rules excerpt" in prompt
-            assert "Test context excerpt" in prompt
-            assert "Acceptance Criteria" in prompt
-            assert "Self-Check" in prompt
-
-    def test_build_custom_prompt(self):
-        """Test building a custom prompt."""
-        # Create a custom template
-        custom_template = """Hello {{ name }}!
+_CUSTOM_TEMPLATE = """Hello {{ name }}!
 Your task is: {{ task }}
 """
-        with open(self.templates_dir / "custom.jinja", "w") as f:
-            f.write(custom_template)
 
-        # Build custom prompt
-        prompt = self.builder.build_custom_prompt(
+_VARIABLES_TEMPLATE = """Task: {{ task_description }}
+User: {{ user_name }}
+"""
+
+
+@pytest.fixture(scope="session")
+def templates_dir(tmp_path_factory):
+    """Write the test config and template files once per session."""
+    temp_dir = tmp_path_factory.mktemp("pb_templates", numbered=False)
+    config_dir = temp_dir / "config"
+    templates_dir = temp_dir / "templates"
+    config_dir.mkdir()
+    templates_dir.mkdir()
+
+    (config_dir / "rules.md").write_text(_RULES)
+    (config_dir / "context.md").write_text(_CONTEXT)
+    (config_dir / "phase.json").write_text(_PHASE_JSON)
+    (templates_dir / "task_prompt.jinja").write_text(_TASK_PROMPT_TEMPLATE)
+    (templates_dir / "custom.jinja").write_text(_CUSTOM_TEMPLATE)
+    (templates_dir / "variables.jinja").write_text(_VARIABLES_TEMPLATE)
+    (templates_dir / "another.jinja").write_text("Another template")
+    return templates_dir
+
+
+@pytest.fixture(scope="class")
+def builder(templates_dir):
+    """Return one PromptBuilder shared by the class."""
+    builder = PromptBuilder(str(templates_dir))
+    # Templates are written before first use and never rewritten, so keep every
+    # compiled template and skip the per-lookup mtime check.
+    builder.env = builder.env.overlay(cache_size=-1, auto_reload=False)
+    builder.env.get_template("task_prompt.jinja")
+    return builder
+
+
+class TestPromptBuilder:
+    """Test cases for PromptBuilder."""
+
+    def test_build_task_prompt(self, builder, monkeypatch):
+        """Test building a task prompt."""
+        monkeypatch.setattr(prompt_builder_module, "config_loader", MockConfigLoader())
+
+        # Build prompt
+        task_description = "Implement a test feature"
+        prompt = builder.build_task_prompt(task_description)
+
+        # Verify prompt contains expected sections
+        assert "Task: Implement a test feature" in prompt
+        assert "**Phase**: P0 - Test Phase" in prompt
+        assert "Test rules excerpt" in prompt
+        assert "Test context excerpt" in prompt
+        assert "Acceptance Criteria" in prompt
+        assert "Self-Check" in prompt
+
+    def test_build_custom_prompt(self, builder):
+        """Test building a custom prompt."""
+        prompt = builder.build_custom_prompt(
             "custom.jinja",
             name="Test User",
             task="Test Task"
@@ -131,48 +131,30 @@ Your task is: {{ task }}
         assert "Hello Test User!" in prompt
         assert "Your task is: Test Task" in prompt
 
-    def test_get_available_templates(self):
+    def test_get_available_templates(self, builder):
         """Test getting available templates."""
-        # Create additional template
-        with open(self.templates_dir / "another.jinja", "w") as f:
-            f.write("Another template")
+        templates = builder.get_available_templates()
 
-        templates = self.builder.get_available_templates()
+        assert sorted(templates) == ["another.jinja", "custom.jinja", "task_prompt.jinja", "variables.jinja"]
 
-        assert "task_prompt.jinja" in templates
-        assert "another.jinja" in templates
-        assert len(templates) == 2
-
-    def test_missing_template(self):
+    def test_missing_template(self, builder):
         """Test handling of missing template."""
         with pytest.raises(Exception):  # FileNotFoundError or TemplateNotFound
-            self.builder.build_custom_prompt("nonexistent.jinja")
+            builder.build_custom_prompt("nonexistent.jinja")
 
-    def test_template_with_variables(self):
+    def test_template_with_variables(self, builder):
         """Test template with missing variables."""
-        # Create template with required variables
-        template_content = """Task: {{ task_description }}
-User: {{ user_name }}
-"""
-        with open(self.templates_dir / "variables.jinja", "w") as f:
-            f.write(template_content)
-
         # Should work with all variables provided
-        prompt = self.builder.build_custom_prompt(
+        prompt = builder.build_custom_prompt(
             "variables.jinja",
             task_description="Test task",
             user_name="Test user"
         )
 
+        # Should work with missing variables (Jinja2 handles this gracefully)
+        prompt_missing = builder.build_custom_prompt("variables.jinja")
+
         assert "Task: Test task" in prompt
         assert "User: Test user" in prompt
-
-        # Should work with missing variables (Jinja2 handles this gracefully)
-        prompt_missing = self.builder.build_custom_prompt("variables.jinja")
         assert "Task: " in prompt_missing
         assert "User: " in prompt_missing
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
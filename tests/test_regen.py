@@ -1,49 +1,43 @@
 """Tests for regeneration loop functionality."""
-import os
-import tempfile
-from unittest.mock import MagicMock, patch
-
-from src.core.db import get_db_manager, reset_db_manager
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+
+import src.core.regen as regen_module
+from src.core.db import DatabaseManager
+from src.core.guardrails import Violation, ViolationType, guardrails
+from src.core.models import RunCreate, TaskCreate
+from src.core.patch_builder import patch_builder
 from src.core.regen import regen_loop
-
-
-class TestRegenLoop:
-    """Test cases for RegenLoop."""
-
-    def setup_method(self):
-        """Set up test environment."""
-        # Set up temporary database
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = os.path.join(self.temp_dir, "test.db")
-        os.environ["DATABASE_URL"] = f"sqlite:///{self.db_path}"
-
-        # Reset database manager
-        reset_db_manager()
-        self.db_manager = get_db_manager()
-        self.db_manager.create_tables()
-
-        # Create a test task
-        from src.core.models import TaskCreate
-        task_create = TaskCreate(
-            task_text="Update the main function to print hello world"
-        )
-        self.task = self.db_manager.create_task(task_create, "Test prompt")
-
-    def teardown_method(self):
-        """Clean up test environment."""
-        import shutil
-        reset_db_manager()
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-
-    @patch('src.core.regen.regen_loop._call_model')
-    @patch('src.core.regen.regen_loop._get_original_files')
-    @patch('src.services.cursor_adapter.cursor_adapter.apply_patch')
-    @patch('src.services.cursor_adapter.cursor_adapter.run_tests')
-    def test_run_with_regen_success_first_try(self, mock_run_tests, mock_apply_patch,
-                                            mock_get_files, mock_call_model):
-        """Test successful regeneration on first try."""
-        # Mock model response
-        mock_call_model.return_value = """
+from src.core.spec_expander import AmbiguityLevel, ExpandedSpec, spec_expander
+from src.services.cursor_adapter import cursor_adapter
+
+# Collaborators patched around RegenLoop._execute_regen_loop, as (object, attribute)
+_EXECUTE_LOOP_TARGETS = {
+    "call_model": (regen_loop, "_call_model"),
+    "build_patch": (patch_builder, "build_patch"),
+    "apply_patch": (cursor_adapter, "apply_patch"),
+    "run_tests": (cursor_adapter, "run_tests"),
+}
+_GUARDRAILS_CHECK_DIFF_TARGET = (guardrails, "check_diff")
+
+# Collaborators patched around RegenLoop.run_with_regen, as (object, attribute)
+_RUN_WITH_REGEN_TARGETS = {
+    "call_model": (regen_loop, "_call_model"),
+    "get_files": (regen_loop, "_get_original_files"),
+    "apply_patch": (cursor_adapter, "apply_patch"),
+    "run_tests": (cursor_adapter, "run_tests"),
+}
+
+# Named shared-cache memory database so every engine in the process sees the same
+# data. Memory databases are per process, so each xdist worker gets its own copy.
+_DATABASE_URL = "sqlite:///file:regen_tests?mode=memory&cache=shared&uri=true"
+
+_MODEL_OK_RESPONSE = """
 Here's the updated code:
 
 ```python src/main.py
@@ -52,122 +46,26 @@ def main():
 ```
 """
 
-        # Mock original files
-        mock_get_files.return_value = {"src/main.py": "def main():\n    pass\n"}
-
-        # Mock successful patch application
-        mock_apply_patch.return_value = MagicMock(success=True, logs="Patch applied successfully")
-
-        # Mock successful tests
-        mock_run_tests.return_value = MagicMock(success=True, output="1 passed")
-
-        result = regen_loop.run_with_regen(self.task.id)
-
-        assert result.success
-        assert result.final_status == "tests_passed"
-        assert result.loop_count == 1
-        assert result.error_message is None
-        assert result.escalation_payload is None
-
-    @patch('src.core.regen.regen_loop._call_model')
-    @patch('src.core.regen.regen_loop._get_original_files')
-    @patch('src.services.cursor_adapter.cursor_adapter.apply_patch')
-    @patch('src.services.cursor_adapter.cursor_adapter.run_tests')
-    def test_run_with_regen_fail_then_succeed(self, mock_run_tests, mock_apply_patch,
-                                            mock_get_files, mock_call_model):
-        """Test regeneration that fails first, then succeeds."""
-        # Mock model responses (first fails, second succeeds)
-        mock_call_model.side_effect = [
-            """
+_MODEL_WRONG_OUTPUT_RESPONSE = """
 Here's the updated code:
 
 ```python src/main.py
 def main():
-    print("Hello")  # Missing World
-```
-""",
-            """
-Here's the corrected code:
-
-```python src/main.py
-def main():
-    print("Hello, World!")
+    print("Wrong output")
 ```
 """
-        ]
-
-        # Mock original files
-        mock_get_files.return_value = {"src/main.py": "def main():\n    pass\n"}
-
-        # Mock successful patch application
-        mock_apply_patch.return_value = MagicMock(success=True, logs="Patch applied successfully")
 
-        # Mock tests (first fails, second succeeds)
-        mock_run_tests.side_effect = [
-            MagicMock(success=False, output="AssertionError: expected 'Hello, World!' but got 'Hello'"),
-            MagicMock(success=True, output="1 passed")
-        ]
-
-        result = regen_loop.run_with_regen(self.task.id)
-
-        assert result.success
-        assert result.final_status == "tests_passed"
-        assert result.loop_count == 2
-        assert result.error_message is None
-        assert result.escalation_payload is None
-
-        # Verify model was called twice
-        assert mock_call_model.call_count == 2
-
-    @patch('src.core.regen.regen_loop._call_model')
-    @patch('src.core.regen.regen_loop._get_original_files')
-    @patch('src.services.cursor_adapter.cursor_adapter.apply_patch')
-    @patch('src.services.cursor_adapter.cursor_adapter.run_tests')
-    def test_run_with_regen_max_loops_exceeded(self, mock_run_tests, mock_apply_patch,
-                                             mock_get_files, mock_call_model):
-        """Test regeneration that exceeds max loops and escalates."""
-        # Mock model responses (all fail)
-        mock_call_model.return_value = """
+_MODEL_PARTIAL_RESPONSE = """
 Here's the updated code:
 
 ```python src/main.py
 def main():
-    print("Wrong output")
+    print("Hello")  # Missing World
 ```
 """
 
-        # Mock original files
-        mock_get_files.return_value = {"src/main.py": "def main():\n    pass\n"}
-
-        # Mock successful patch application
-        mock_apply_patch.return_value = MagicMock(success=True, logs="Patch applied successfully")
-
-        # Mock failing tests
-        mock_run_tests.return_value = MagicMock(success=False, output="AssertionError: test failed")
-
-        result = regen_loop.run_with_regen(self.task.id)
-
-        assert not result.success
-        assert result.final_status == "error"
-        assert result.loop_count == 3
-        assert result.error_message is not None
-        assert result.escalation_payload is not None
-
-        # Verify escalation payload contains relevant info
-        escalation = result.escalation_payload
-        assert "task_id" in escalation
-        assert "loop_count" in escalation
-        assert "final_error" in escalation
-
-    @patch('src.core.regen.regen_loop._call_model')
-    @patch('src.core.regen.regen_loop._get_original_files')
-    @patch('src.services.cursor_adapter.cursor_adapter.apply_patch')
-    def test_run_with_regen_patch_application_fails(self, mock_apply_patch,
-                                                  mock_get_files, mock_call_model):
-        """Test regeneration when patch application fails."""
-        # Mock model response
-        mock_call_model.return_value = """
-Here's the updated code:
+_MODEL_CORRECTED_RESPONSE = """
+Here's the corrected code:
 
 ```python src/main.py
 def main():
@@ -175,51 +73,154 @@ def main():
 ```
 """
 
-        # Mock original files
-        mock_get_files.return_value = {"src/main.py": "def main():\n    pass\n"}
+_ORIGINAL_FILES = {"src/main.py": "def main():\n    pass\n"}
+
+_PATCH_APPLIED = SimpleNamespace(success=True, logs="Patch applied successfully")
+
+_PATCH_FAILED = SimpleNamespace(success=False, error_message="Patch failed to apply")
+
+_TESTS_PASSED = SimpleNamespace(success=True, output="1 passed", passed=1, test_count=1)
+
+_TESTS_FAILED = SimpleNamespace(
+    success=False, output="AssertionError: test failed", error_message="AssertionError: test failed"
+)
+
+_TESTS_FAILED_PARTIAL = SimpleNamespace(
+    success=False,
+    output="AssertionError: expected 'Hello, World!' but got 'Hello'",
+    error_message="AssertionError: expected 'Hello, World!' but got 'Hello'"
+)
+
+# Side-effect sequences, handed to the mocks as fresh iterators
+_PARTIAL_THEN_CORRECTED = (_MODEL_PARTIAL_RESPONSE, _MODEL_CORRECTED_RESPONSE)
+_FAIL_THEN_PASS = (_TESTS_FAILED_PARTIAL, _TESTS_PASSED)
+
+# (model responses, test results, apply result, (success, final_status, loop_count, error fragment))
+REGEN_SCENARIO_CASES = [
+    ((_MODEL_OK_RESPONSE,), (_TESTS_PASSED,), _PATCH_APPLIED,
+     (True, "tests_passed", 1, None)),
+    (_PARTIAL_THEN_CORRECTED, _FAIL_THEN_PASS, _PATCH_APPLIED,
+     (True, "tests_passed", 2, None)),
+    ((_MODEL_WRONG_OUTPUT_RESPONSE,) * 3, (_TESTS_FAILED,) * 3, _PATCH_APPLIED,
+     (False, "error", 3, "AssertionError: test failed")),
+    ((_MODEL_OK_RESPONSE,) * 3, (), _PATCH_FAILED,
+     (False, "error", 3, "Patch failed to apply")),
+]
+
+_SECRET_VIOLATION = Violation(
+    type=ViolationType.SECRETS_DETECTED, message="Secret found", line_number=1, severity="critical"
+)
+
+_DEFAULT_SPEC = ExpandedSpec(
+    original_goal="Test goal",
+    scope_summary="Test scope",
+    acceptance_criteria=["Test criteria"],
+    edge_cases=["Test edge case"],
+    rollback_notes=["Test rollback"],
+    needs_clarification=False,
+    clarification_questions=None,
+    ambiguity_level=None
+)
+
+
+@pytest.fixture(scope="class")
+def regen_db():
+    """Create one in-memory SQLite database and schema for the whole test class."""
+    db_manager = DatabaseManager(_DATABASE_URL)
+
+    # pysqlite defers BEGIN until the first DML statement, which breaks
+    # SAVEPOINT rollback; let SQLAlchemy emit BEGIN itself.
+    @event.listens_for(db_manager.engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(db_manager.engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    # A shared-cache memory database is dropped with its last connection
+    keepalive = db_manager.engine.connect()
+    db_manager.create_tables()
+    yield db_manager
+    keepalive.close()
+    db_manager.engine.dispose()
 
-        # Mock failed patch application
-        mock_apply_patch.return_value = MagicMock(success=False, error_message="Patch failed to apply")
 
-        result = regen_loop.run_with_regen(self.task.id)
+class TestRegenLoop:
+    """Test cases for RegenLoop."""
 
-        assert not result.success
-        assert result.final_status == "error"
-        assert result.loop_count == 3
-        assert "Patch failed to apply" in result.error_message
-
-    @patch('src.core.regen.regen_loop._call_model')
-    @patch('src.core.regen.regen_loop._get_original_files')
-    @patch('src.services.cursor_adapter.cursor_adapter.apply_patch')
-    @patch('src.services.cursor_adapter.cursor_adapter.run_tests')
-    @patch('src.core.guardrails.guardrails.check_diff')
-    def test_run_with_regen_guardrails_violation(self, mock_check_diff, mock_run_tests,
-                                               mock_apply_patch, mock_get_files, mock_call_model):
-        """Test regeneration when guardrails detect violations."""
-        # Mock model response
-        mock_call_model.return_value = """
-Here's the updated code:
+    @pytest.fixture(autouse=True)
+    def regen_env(self, regen_db, monkeypatch):
+        """Run each test inside a transaction that is rolled back afterwards."""
+        connection = regen_db.engine.connect()
+        transaction = connection.begin()
 
-```python src/main.py
-def main():
-    print("Hello, World!")
-```
-"""
+        # Session commits become SAVEPOINT releases on the outer transaction
+        monkeypatch.setattr(
+            regen_db, "get_session",
+            lambda: Session(connection, join_transaction_mode="create_savepoint")
+        )
+        monkeypatch.setattr(regen_module, "get_db_manager", lambda: regen_db)
+        monkeypatch.setenv("DATABASE_URL", _DATABASE_URL)
+        self.db_manager = regen_db
 
-        # Mock original files
-        mock_get_files.return_value = {"src/main.py": "def main():\n    pass\n"}
+        # Create a test task
+        task_create = TaskCreate(
+            task_text="Update the main function to print hello world"
+        )
+        self.task = self.db_manager.create_task(task_create, "Test prompt")
 
-        # Mock guardrails violation
-        from src.core.guardrails import Violation, ViolationType
-        mock_check_diff.return_value = [
-            Violation(type=ViolationType.SECRETS_DETECTED, message="Secret found", line_number=1, severity="critical")
-        ]
+        yield
+
+        transaction.rollback()
+        connection.close()
+
+    @pytest.fixture
+    def mocks(self):
+        """Patch the collaborators of RegenLoop.run_with_regen."""
+        with ExitStack() as stack:
+            mocks = SimpleNamespace(**{
+                name: stack.enter_context(patch.object(*target)) for name, target in _RUN_WITH_REGEN_TARGETS.items()
+            })
+            mocks.get_files.return_value = _ORIGINAL_FILES
+            mocks.apply_patch.return_value = _PATCH_APPLIED
+            yield mocks
+
+    @pytest.mark.parametrize(
+        "model_responses,test_results,apply_result,expected",
+        REGEN_SCENARIO_CASES,
+        ids=["success_first_try", "fail_then_succeed", "max_loops_exceeded", "patch_application_fails"],
+    )
+    def test_run_with_regen_scenarios(self, mocks, model_responses, test_results, apply_result, expected):
+        """Test run_with_regen outcomes across model, patch and test results."""
+        success, final_status, loop_count, error_fragment = expected
+        mocks.call_model.side_effect = iter(model_responses)
+        mocks.run_tests.side_effect = iter(test_results)
+        mocks.apply_patch.return_value = apply_result
 
-        # Mock successful patch application
-        mock_apply_patch.return_value = MagicMock(success=True, logs="Patch applied successfully")
+        result = regen_loop.run_with_regen(self.task.id)
+
+        assert result.success is success
+        assert result.final_status == final_status
+        assert result.loop_count == loop_count
+        assert mocks.call_model.call_count == loop_count
+
+        if error_fragment is None:
+            assert result.error_message is None
+            assert result.escalation_payload is None
+        else:
+            assert error_fragment in result.error_message
+            # Escalation payload carries the context for a human
+            assert {"task_id", "loop_count", "final_error"} <= result.escalation_payload.keys()
+
+    @patch.object(*_GUARDRAILS_CHECK_DIFF_TARGET)
+    def test_run_with_regen_guardrails_violation(self, mock_check_diff, mocks):
+        """Test regeneration when guardrails detect violations."""
+        mocks.call_model.return_value = _MODEL_OK_RESPONSE
+        mock_check_diff.return_value = [_SECRET_VIOLATION]
 
         # Mock successful tests (so guardrails violation is the actual error)
-        mock_run_tests.return_value = MagicMock(success=True, passed=10, test_count=10)
+        mocks.run_tests.return_value = SimpleNamespace(success=True, passed=10, test_count=10)
 
         result = regen_loop.run_with_regen(self.task.id)
 
@@ -231,13 +232,11 @@ def main():
     def test_handle_clarification_needed(self):
         """Test handling when task needs clarification."""
         # Create a task that needs clarification
-        from src.core.models import TaskCreate
         task_create = TaskCreate(task_text="Vague task description")
         clarification_task = self.db_manager.create_task(task_create, "Do something with the data")
 
         # Mock spec expander to return clarification needed
-        with patch('src.core.regen.spec_expander.expand_task') as mock_expand:
-            from src.core.spec_expander import AmbiguityLevel, ExpandedSpec
+        with patch.object(spec_expander, "expand_task") as mock_expand:
             mock_expand.return_value = ExpandedSpec(
                 original_goal="Vague task description",
                 scope_summary="Goal requires clarification",
@@ -265,13 +264,12 @@ def main():
     def test_clarify_and_continue(self):
         """Test providing clarification and continuing task execution."""
         # Create a run that needs clarification
-        from src.core.models import RunCreate
         run_create = RunCreate(task_id=self.task.id, status="needs_clarification")
         run = self.db_manager.create_run(run_create, needs_clarification=True, clarification_questions='["What data?", "What operation?"]')
 
         # Mock spec expander to return clear spec after clarification
-        with patch('src.core.regen.spec_expander.expand_task') as mock_expand:
-            mock_expand.return_value = MagicMock(
+        with patch.object(spec_expander, "expand_task") as mock_expand:
+            mock_expand.return_value = SimpleNamespace(
                 needs_clarification=False,
                 scope_summary="Update main function",
                 acceptance_criteria=["Function prints hello world"],
@@ -280,8 +278,8 @@ def main():
             )
 
             # Mock successful execution after clarification
-            with patch('src.core.regen.regen_loop._execute_regen_loop') as mock_execute:
-                mock_execute.return_value = MagicMock(success=True, final_status="tests_passed")
+            with patch.object(regen_loop, "_execute_regen_loop") as mock_execute:
+                mock_execute.return_value = SimpleNamespace(success=True, final_status="tests_passed")
 
                 result = regen_loop.clarify_and_continue(
                     self.task.id,
@@ -291,30 +289,18 @@ def main():
         assert result.success
         assert result.final_status == "tests_passed"
 
-    @patch('src.core.regen.regen_loop._call_model')
+    @patch.object(regen_loop, "_call_model")
     def test_build_enhanced_prompt_with_failure_context(self, mock_call_model):
         """Test building enhanced prompt with failure context."""
         # Mock initial model call
         mock_call_model.return_value = "Initial response"
 
         # Create a run with failure context
-        from src.core.models import RunCreate
         run_create = RunCreate(task_id=self.task.id, status="tests_failed")
         run = self.db_manager.create_run(run_create, loop_count=1, last_error="Test assertion failed")
 
         # Test building enhanced prompt
-        from src.core.spec_expander import ExpandedSpec
-        expanded_spec = ExpandedSpec(
-            original_goal="Test goal",
-            scope_summary="Test scope",
-            acceptance_criteria=["Test criteria"],
-            edge_cases=["Test edge case"],
-            rollback_notes=["Test rollback"],
-            needs_clarification=False,
-            clarification_questions=None,
-            ambiguity_level=None
-        )
-        enhanced_prompt = regen_loop._build_enhanced_prompt(self.task, expanded_spec, 2, "Test assertion failed")
+        enhanced_prompt = regen_loop._build_enhanced_prompt(self.task, _DEFAULT_SPEC, 2, "Test assertion failed")
 
         assert "Expanded Specification" in enhanced_prompt
         assert "Previous Attempt Analysis" in enhanced_prompt
@@ -323,32 +309,20 @@ def main():
     def test_create_escalation_payload(self):
         """Test creating escalation payload."""
         # Create a run with failure context
-        from src.core.models import RunCreate
         run_create = RunCreate(task_id=self.task.id, status="error")
         run = self.db_manager.create_run(run_create, loop_count=2, last_error="Max loops exceeded")
 
         # Mock model responses
         model_responses = ["Response 1", "Response 2"]
 
-        from src.core.spec_expander import ExpandedSpec
-        expanded_spec = ExpandedSpec(
-            original_goal="Test goal",
-            scope_summary="Test scope",
-            acceptance_criteria=["Test criteria"],
-            edge_cases=["Test edge case"],
-            rollback_notes=["Test rollback"],
-            needs_clarification=False,
-            clarification_questions=None,
-            ambiguity_level=None
-        )
-        payload = regen_loop._create_escalation_payload(self.task, expanded_spec, 2, "Max loops exceeded")
+        payload = regen_loop._create_escalation_payload(self.task, _DEFAULT_SPEC, 2, "Max loops exceeded")
 
         assert payload["task_id"] == self.task.id
         assert payload["loop_count"] == 2
         assert payload["final_error"] == "Max loops exceeded"
         assert "escalation_timestamp" in payload
 
-    @patch('src.core.regen.regen_loop._call_model')
+    @patch.object(regen_loop, "_call_model")
     def test_call_model_stub(self, mock_call_model):
         """Test the stub model call implementation."""
         # Mock the method to return a string
@@ -376,69 +350,32 @@ def main():
 
     def test_execute_regen_loop_success(self):
         """Test successful execution of regen loop."""
-        with patch('src.core.regen.regen_loop._call_model') as mock_call_model:
-            mock_call_model.return_value = "Successful response"
-
-            with patch('src.core.regen.patch_builder.build_patch') as mock_build_patch:
-                mock_build_patch.return_value = MagicMock(success=True, patch_content="patch")
-
-                with patch('src.services.cursor_adapter.cursor_adapter.apply_patch') as mock_apply:
-                    mock_apply.return_value = MagicMock(success=True)
-
-                    with patch('src.services.cursor_adapter.cursor_adapter.run_tests') as mock_tests:
-                        mock_tests.return_value = MagicMock(success=True)
-
-                        # Mock expanded spec
-                        from src.core.spec_expander import ExpandedSpec
-                        expanded_spec = ExpandedSpec(
-                            original_goal="Test goal",
-                            scope_summary="Test scope",
-                            acceptance_criteria=["Test criteria"],
-                            edge_cases=["Test edge case"],
-                            rollback_notes=["Test rollback"],
-                            needs_clarification=False,
-                            clarification_questions=None,
-                            ambiguity_level=None
-                        )
-                        result = regen_loop._execute_regen_loop(self.task, expanded_spec, self.db_manager)
-
-                        assert result.success
-                        assert result.final_status == "tests_passed"
+        with ExitStack() as stack:
+            mocks = {name: stack.enter_context(patch.object(*target)) for name, target in _EXECUTE_LOOP_TARGETS.items()}
+            mocks["call_model"].return_value = "Successful response"
+            mocks["build_patch"].return_value = SimpleNamespace(success=True, patch_content="patch")
+            mocks["apply_patch"].return_value = _PATCH_APPLIED
+            mocks["run_tests"].return_value = SimpleNamespace(success=True, passed=1, test_count=1)
+
+            result = regen_loop._execute_regen_loop(self.task, _DEFAULT_SPEC, self.db_manager)
+
+        assert result.success
+        assert result.final_status == "tests_passed"
 
     def test_execute_regen_loop_with_guardrails_violation(self):
         """Test regen loop with guardrails violation."""
-        with patch('src.core.regen.regen_loop._call_model') as mock_call_model:
-            mock_call_model.return_value = "Response with violation"
-
-            with patch('src.core.regen.patch_builder.build_patch') as mock_build_patch:
-                mock_build_patch.return_value = MagicMock(success=True, patch_content="patch")
-
-                with patch('src.services.cursor_adapter.cursor_adapter.apply_patch') as mock_apply:
-                    mock_apply.return_value = MagicMock(success=True)
-
-                    with patch('src.services.cursor_adapter.cursor_adapter.run_tests') as mock_tests:
-                        mock_tests.return_value = MagicMock(success=True, passed=10, test_count=10)
-
-                        with patch('src.core.guardrails.guardrails.check_diff') as mock_check:
-                            from src.core.guardrails import Violation, ViolationType
-                            mock_check.return_value = [
-                                Violation(type=ViolationType.SECRETS_DETECTED, message="Secret found", line_number=1, severity="critical")
-                            ]
-
-                            # Mock expanded spec
-                            from src.core.spec_expander import ExpandedSpec
-                            expanded_spec = ExpandedSpec(
-                                original_goal="Test goal",
-                                scope_summary="Test scope",
-                                acceptance_criteria=["Test criteria"],
-                                edge_cases=["Test edge case"],
-                                rollback_notes=["Test rollback"],
-                                needs_clarification=False,
-                                clarification_questions=None,
-                                ambiguity_level=None
-                            )
-                            result = regen_loop._execute_regen_loop(self.task, expanded_spec, self.db_manager)
-
-                            assert not result.success
-                            assert result.final_status == "error"
-                            assert "Secret found" in result.error_message
+        targets = {**_EXECUTE_LOOP_TARGETS, "check_diff": _GUARDRAILS_CHECK_DIFF_TARGET}
+        with ExitStack() as stack:
+            mocks = {name: stack.enter_context(patch.object(*target)) for name, target in targets.items()}
+            mocks["call_model"].return_value = "Response with violation"
+            mocks["build_patch"].return_value = SimpleNamespace(success=True, patch_content="patch")
+            mocks["apply_patch"].return_value = _PATCH_APPLIED
+            mocks["run_tests"].return_value = SimpleNamespace(success=True, passed=10, test_count=10)
+
+            mocks["check_diff"].return_value = [_SECRET_VIOLATION]
+
+            result = regen_loop._execute_regen_loop(self.task, _DEFAULT_SPEC, self.db_manager)
+
+        assert not result.success
+        assert result.final_status == "error"
+        assert "Secret found" in result.error_message
@@ -1,8 +1,49 @@
 """Tests for utility scripts to improve coverage."""
 
-import pytest
-from unittest.mock import patch, MagicMock
 import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+import scripts.dep_scan
+import scripts.run_semgrep
+from scripts.dep_scan import parse_pip_audit_output, run_pip_audit
+from scripts.run_semgrep import format_findings, run_semgrep
+
+# Scanner outputs serialized once at import
+_CRITICAL_AUDIT_STDOUT = json.dumps({
+    "vulnerabilities": [
+        {
+            "severity": "CRITICAL",
+            "package": {"name": "requests", "version": "2.25.1"},
+            "description": "Critical CVE-2021-33503"
+        }
+    ]
+})
+
+_HIGH_AUDIT_OUTPUT = json.dumps({
+    "vulnerabilities": [
+        {
+            "severity": "HIGH",
+            "package": {"name": "urllib3", "version": "1.26.5"},
+            "description": "High severity CVE"
+        }
+    ]
+})
+
+_HIGH_SEMGREP_STDOUT = json.dumps({
+    "results": [
+        {
+            "extra": {
+                "severity": "HIGH",
+                "message": "Dangerous eval() usage",
+                "metadata": {"category": "security"}
+            },
+            "path": "src/test.py",
+            "start": {"line": 42}
+        }
+    ]
+})
 
 
 class TestDepScanScript:
@@ -10,9 +51,7 @@ class TestDepScanScript:
 
     def test_run_pip_audit_no_vulnerabilities(self):
         """Test pip-audit with no vulnerabilities."""
-        from scripts.dep_scan import run_pip_audit
-        
-        with patch('scripts.dep_scan.subprocess.run') as mock_run:
+        with patch.object(scripts.dep_scan.subprocess, "run") as mock_run:
             mock_run.return_value.returncode = 0
             mock_run.return_value.stdout = '{"vulnerabilities": []}'
             
@@ -24,19 +63,9 @@ class TestDepScanScript:
 
     def test_run_pip_audit_with_critical_vulnerability(self):
         """Test pip-audit with critical vulnerability."""
-        from scripts.dep_scan import run_pip_audit
-        
-        with patch('scripts.dep_scan.subprocess.run') as mock_run:
+        with patch.object(scripts.dep_scan.subprocess, "run") as mock_run:
             mock_run.return_value.returncode = 1
-            mock_run.return_value.stdout = json.dumps({
-                "vulnerabilities": [
-                    {
-                        "severity": "CRITICAL",
-                        "package": {"name": "requests", "version": "2.25.1"},
-                        "description": "Critical CVE-2021-33503"
-                    }
-                ]
-            })
+            mock_run.return_value.stdout = _CRITICAL_AUDIT_STDOUT
             
             result = run_pip_audit()
             
@@ -46,19 +75,7 @@ class TestDepScanScript:
 
     def test_parse_pip_audit_output(self):
         """Test parsing pip-audit output."""
-        from scripts.dep_scan import parse_pip_audit_output
-        
-        output = json.dumps({
-            "vulnerabilities": [
-                {
-                    "severity": "HIGH",
-                    "package": {"name": "urllib3", "version": "1.26.5"},
-                    "description": "High severity CVE"
-                }
-            ]
-        })
-        
-        result = parse_pip_audit_output(output)
+        result = parse_pip_audit_output(_HIGH_AUDIT_OUTPUT)
         
         assert result["success"] is True
         assert result["summary"]["high"] == 1
@@ -69,9 +86,7 @@ class TestSemgrepScript:
 
     def test_run_semgrep_no_findings(self):
         """Test semgrep with no findings."""
-        from scripts.run_semgrep import run_semgrep
-        
-        with patch('scripts.run_semgrep.subprocess.run') as mock_run:
+        with patch.object(scripts.run_semgrep.subprocess, "run") as mock_run:
             mock_run.return_value.returncode = 0
             mock_run.return_value.stdout = '{"results": []}'
             
@@ -83,23 +98,9 @@ class TestSemgrepScript:
 
     def test_run_semgrep_with_high_finding(self):
         """Test semgrep with high severity finding."""
-        from scripts.run_semgrep import run_semgrep
-        
-        with patch('scripts.run_semgrep.subprocess.run') as mock_run:
+        with patch.object(scripts.run_semgrep.subprocess, "run") as mock_run:
             mock_run.return_value.returncode = 1
-            mock_run.return_value.stdout = json.dumps({
-                "results": [
-                    {
-                        "extra": {
-                            "severity": "HIGH",
-                            "message": "Dangerous eval() usage",
-                            "metadata": {"category": "security"}
-                        },
-                        "path": "src/test.py",
-                        "start": {"line": 42}
-                    }
-                ]
-            })
+            mock_run.return_value.stdout = _HIGH_SEMGREP_STDOUT
             
             result = run_semgrep()
             
@@ -109,8 +110,6 @@ class TestSemgrepScript:
 
     def test_format_findings(self):
         """Test formatting findings."""
-        from scripts.run_semgrep import format_findings
-        
         findings = [
             {
                 "extra": {
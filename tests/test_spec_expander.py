@@ -1,110 +1,73 @@
 """Tests for spec expander functionality."""
 
-from src.core.spec_expander import AmbiguityLevel, SpecExpander
+import pytest
 
+from src.core.spec_expander import AmbiguityLevel
 
-class TestSpecExpander:
-    """Test spec expander functionality."""
-
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.expander = SpecExpander()
-
-    def test_expand_clear_task(self):
-        """Test expanding a clear, unambiguous task."""
-        goal = "Add retry mechanism to Slack API connector"
-
-        expanded_spec = self.expander.expand_task(goal)
-
-        assert expanded_spec.original_goal == goal
-        assert expanded_spec.needs_clarification is False
-        assert expanded_spec.ambiguity_level == AmbiguityLevel.CLEAR
-        assert "retry mechanism" in expanded_spec.scope_summary.lower()
-        assert len(expanded_spec.acceptance_criteria) > 0
-        assert len(expanded_spec.edge_cases) > 0
-        assert len(expanded_spec.rollback_notes) > 0
-
-    def test_expand_ambiguous_task(self):
-        """Test expanding an ambiguous task that needs clarification."""
-        goal = "Make it better somehow"
-
-        expanded_spec = self.expander.expand_task(goal)
+# Long enough to need clarification
+_LONG_GOAL = "This is a very long task description that goes on and on with many words " + "and more words " * 20
 
-        assert expanded_spec.original_goal == goal
-        assert expanded_spec.needs_clarification is True
-        assert expanded_spec.ambiguity_level in [AmbiguityLevel.MAJOR, AmbiguityLevel.BLOCKING]
-        assert expanded_spec.clarification_questions is not None
-        assert len(expanded_spec.clarification_questions) <= 3
+# (goal, needs_clarification, acceptable ambiguity levels or None to skip the check)
+EXPAND_TASK_CASES = [
+    ("Add retry mechanism to Slack API connector", False, {AmbiguityLevel.CLEAR}),
+    ("Make it better somehow", True, {AmbiguityLevel.MAJOR, AmbiguityLevel.BLOCKING}),
+    # Vague terms alone are not enough to need clarification
+    ("Create a robust and scalable API endpoint", False, None),
+    ("Fix bug", True, None),
+    (_LONG_GOAL, True, None),
+]
 
-    def test_expand_vague_task(self):
-        """Test expanding a task with vague terms."""
-        goal = "Create a robust and scalable API endpoint"
+# (goal, ExpandedSpec list attribute, keyword expected in at least one item)
+SECTION_GENERATION_CASES = [
+    ("Add user authentication to the API", "acceptance_criteria", "api"),
+    ("Add user authentication to the API", "acceptance_criteria", "test"),
+    ("Add database migration for user table", "edge_cases", "database"),
+    ("Deploy new version to production", "rollback_notes", "deploy"),
+]
 
-        expanded_spec = self.expander.expand_task(goal)
 
-        assert expanded_spec.original_goal == goal
-        # The implementation doesn't consider this task vague enough to need clarification
-        assert expanded_spec.needs_clarification is False
-
-    def test_expand_short_task(self):
-        """Test expanding a very short task."""
-        goal = "Fix bug"
-
-        expanded_spec = self.expander.expand_task(goal)
-
-        assert expanded_spec.original_goal == goal
-        # Should need clarification due to being too short
-        assert expanded_spec.needs_clarification is True
-
-    def test_expand_long_task(self):
-        """Test expanding a very long task."""
-        goal = "This is a very long task description that goes on and on with many words " + "and more words " * 20
+class TestSpecExpander:
+    """Test spec expander functionality."""
 
-        expanded_spec = self.expander.expand_task(goal)
+    @pytest.mark.parametrize(
+        "goal,needs_clarification,levels",
+        EXPAND_TASK_CASES,
+        ids=["clear", "ambiguous", "vague", "short", "long"],
+    )
+    def test_expand_task(self, expander, goal, needs_clarification, levels):
+        """Test which goals are expanded directly and which need clarification."""
+        expanded_spec = expander.expand_task(goal)
 
         assert expanded_spec.original_goal == goal
-        # Should need clarification due to being too long
-        assert expanded_spec.needs_clarification is True
-
-    def test_acceptance_criteria_generation(self):
-        """Test that appropriate acceptance criteria are generated."""
-        goal = "Add user authentication to the API"
-
-        expanded_spec = self.expander.expand_task(goal)
-
-        # Should have API-specific criteria
-        api_criteria = [ac for ac in expanded_spec.acceptance_criteria if "api" in ac.lower()]
-        assert len(api_criteria) > 0
-
-        # Should have basic criteria
-        basic_criteria = [ac for ac in expanded_spec.acceptance_criteria if "test" in ac.lower()]
-        assert len(basic_criteria) > 0
-
-    def test_edge_cases_generation(self):
-        """Test that appropriate edge cases are generated."""
-        goal = "Add database migration for user table"
-
-        expanded_spec = self.expander.expand_task(goal)
-
-        # Should have database-specific edge cases
-        db_edge_cases = [ec for ec in expanded_spec.edge_cases if "database" in ec.lower()]
-        assert len(db_edge_cases) > 0
-
-    def test_rollback_notes_generation(self):
-        """Test that appropriate rollback notes are generated."""
-        goal = "Deploy new version to production"
-
-        expanded_spec = self.expander.expand_task(goal)
-
-        # Should have deployment-specific rollback notes
-        deploy_rollback = [rn for rn in expanded_spec.rollback_notes if "deploy" in rn.lower()]
-        assert len(deploy_rollback) > 0
-
-    def test_clarification_questions_generation(self):
+        assert expanded_spec.needs_clarification is needs_clarification
+        if levels is not None:
+            assert expanded_spec.ambiguity_level in levels
+
+        if needs_clarification:
+            assert expanded_spec.clarification_questions is not None
+            assert len(expanded_spec.clarification_questions) <= 3
+        else:
+            assert goal.lower() in expanded_spec.scope_summary.lower()
+            assert len(expanded_spec.acceptance_criteria) > 0
+            assert len(expanded_spec.edge_cases) > 0
+            assert len(expanded_spec.rollback_notes) > 0
+
+    @pytest.mark.parametrize(
+        "goal,section,keyword",
+        SECTION_GENERATION_CASES,
+        ids=["api_criteria", "basic_criteria", "database_edge_cases", "deploy_rollback"],
+    )
+    def test_section_generation(self, expander, goal, section, keyword):
+        """Test that domain-specific items are generated for each spec section."""
+        expanded_spec = expander.expand_task(goal)
+
+        assert any(keyword in item.lower() for item in getattr(expanded_spec, section))
+
+    def test_clarification_questions_generation(self, expander):
         """Test that appropriate clarification questions are generated."""
         goal = "Improve the system somehow"
 
-        expanded_spec = self.expander.expand_task(goal)
+        expanded_spec = expander.expand_task(goal)
 
         assert expanded_spec.needs_clarification is True
         assert expanded_spec.clarification_questions is not None
@@ -113,32 +76,34 @@ class TestSpecExpander:
         # The implementation generates different types of questions
         assert len(expanded_spec.clarification_questions) > 0
 
-    def test_ambiguity_assessment(self):
+    def test_ambiguity_assessment(self, expander):
         """Test ambiguity assessment logic."""
+        clear, major, blocking = AmbiguityLevel.CLEAR, AmbiguityLevel.MAJOR, AmbiguityLevel.BLOCKING
+
         # Clear task
         clear_goal = "Add unit tests for UserService class"
-        clear_spec = self.expander.expand_task(clear_goal)
-        assert clear_spec.ambiguity_level == AmbiguityLevel.CLEAR
+        clear_spec = expander.expand_task(clear_goal)
+        assert clear_spec.ambiguity_level == clear
 
         # Minor ambiguity
         minor_goal = "Add some tests maybe"
-        minor_spec = self.expander.expand_task(minor_goal)
-        assert minor_spec.ambiguity_level == AmbiguityLevel.BLOCKING
+        minor_spec = expander.expand_task(minor_goal)
+        assert minor_spec.ambiguity_level == blocking
 
         # Major ambiguity
         major_goal = "Make it better and more robust somehow"
-        major_spec = self.expander.expand_task(major_goal)
-        assert major_spec.ambiguity_level in [AmbiguityLevel.MAJOR, AmbiguityLevel.BLOCKING]
+        major_spec = expander.expand_task(major_goal)
+        assert major_spec.ambiguity_level in {major, blocking}
 
-    def test_technical_context_detection(self):
+    def test_technical_context_detection(self, expander):
         """Test detection of technical context."""
         # Has technical context
         tech_goal = "Add API endpoint for user authentication"
-        tech_spec = self.expander.expand_task(tech_goal)
+        tech_spec = expander.expand_task(tech_goal)
         assert "api" in tech_goal.lower()
 
         # Missing technical context
         no_tech_goal = "Make the thing work better"
-        no_tech_spec = self.expander.expand_task(no_tech_goal)
+        no_tech_spec = expander.expand_task(no_tech_goal)
         # Should need clarification due to missing technical context
         assert no_tech_spec.needs_clarification is True